@@ -36,11 +36,10 @@ CREATE TABLE IF NOT EXISTS agent_profiles (
 );
 
 -- Create indexes
-CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-CREATE INDEX IF NOT EXISTS idx_tasks_agent ON tasks(agent_id);
 CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_activity_events_type ON activity_events(event_type);
-CREATE INDEX IF NOT EXISTS idx_activity_events_created ON activity_events(created_at DESC);
+
+-- Query indexes and change notification triggers for the API are installed by
+-- the Mission Control API on startup (SCHEMA_SQL in scripts/api_server.py)
 
 -- Insert default task categories/backlog items
 INSERT INTO tasks (title, description, status, priority) VALUES
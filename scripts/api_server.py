@@ -8,15 +8,23 @@ Runs as a Docker service with PostgreSQL backend.
 
 import os
 import asyncio
-import json
+import hmac
+import time
 import uuid
-from datetime import datetime
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from operator import itemgetter
 from typing import Optional, List, Any
 
-from fastapi import FastAPI, HTTPException, Query, Header
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 import asyncpg
+import msgspec
+import orjson
 from aiohttp import ClientSession, ClientError
 
 # Configuration
@@ -26,10 +34,128 @@ DB_URL = os.getenv("MISSION_CONTROL_DB_URL")
 TOKEN = os.getenv("MISSION_CONTROL_TOKEN", "")
 OPENCLAW_INSTANCE_ID = os.getenv("OPENCLAW_INSTANCE_ID", "vps")
 OPENCLAW_GATEWAY_URL = os.getenv("OPENCLAW_GATEWAY_URL", "http://openclaw:18789")
+WORKERS = int(os.getenv("MISSION_CONTROL_WORKERS", "1"))
+# Pool bounds are totals across all workers, keep them below Postgres
+# max_connections minus its reserved slots
+DB_POOL_MIN = int(os.getenv("MISSION_CONTROL_DB_POOL_MIN", "10"))
+DB_POOL_MAX = int(os.getenv("MISSION_CONTROL_DB_POOL_MAX", "50"))
+# Per-query timeout (seconds) so a stuck query does not hold a pool slot
+QUERY_TIMEOUT = float(os.getenv("MISSION_CONTROL_QUERY_TIMEOUT", "5"))
+# Seconds read-mostly listings are served from the in-process cache
+CACHE_TTL = float(os.getenv("MISSION_CONTROL_CACHE_TTL", "5"))
+CACHE_MAX_ENTRIES = 1024
 
 # Database connection pool
 pool: asyncpg.Pool = None
 
+# Fixed queries; asyncpg prepares and caches each one per pooled connection
+TASKS_BY_STATUS_SQL = "SELECT * FROM tasks WHERE status = $1 ORDER BY priority DESC, created_at DESC"
+TASKS_BY_AGENT_SQL = "SELECT * FROM tasks WHERE agent_id = $1 ORDER BY priority DESC, created_at DESC"
+TASKS_ALL_SQL = "SELECT * FROM tasks ORDER BY priority DESC, created_at DESC"
+TASKS_RECENT_SQL = "SELECT * FROM tasks ORDER BY updated_at DESC LIMIT 100"
+TASK_BY_ID_SQL = "SELECT * FROM tasks WHERE id = $1"
+TASK_INSERT_SQL = """
+    INSERT INTO tasks (id, title, description, status, priority, agent_id)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    RETURNING *
+"""
+TASK_DELETE_SQL = "DELETE FROM tasks WHERE id = $1 RETURNING id"
+ACTIVITY_BY_TYPE_SQL = "SELECT * FROM activity_events WHERE event_type = $1 ORDER BY created_at DESC LIMIT $2"
+ACTIVITY_RECENT_SQL = "SELECT * FROM activity_events ORDER BY created_at DESC, id DESC LIMIT $1"
+# Keyset page after a (created_at, id) cursor, oldest first
+ACTIVITY_SINCE_SQL = """
+    SELECT * FROM activity_events
+    WHERE (created_at, id) > ($1, $2)
+    ORDER BY created_at, id
+    LIMIT $3
+"""
+AGENT_PROFILES_SQL = "SELECT * FROM agent_profiles ORDER BY name"
+AGENT_PROFILE_BY_ID_SQL = "SELECT * FROM agent_profiles WHERE agent_id = $1"
+
+# Updatable task columns, in the order they appear in UPDATE statements
+TASK_UPDATE_COLUMNS = ("title", "description", "status", "priority", "agent_id", "completed_at", "updated_at")
+
+# Database objects the API depends on, applied idempotently on every startup
+# so existing installations pick them up (init-db.sql only runs on a fresh volume)
+SCHEMA_SQL = """
+    -- Composite indexes match the filter + ORDER BY of each query so lists are read in index order
+    CREATE INDEX IF NOT EXISTS idx_tasks_status_priority_created ON tasks(status, priority DESC, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_tasks_agent_priority_created ON tasks(agent_id, priority DESC, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_tasks_priority_created ON tasks(priority DESC, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks(updated_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_activity_events_type_created ON activity_events(event_type, created_at DESC);
+    -- Serves both the newest-first listing (scanned backwards) and the stream's keyset cursor
+    CREATE INDEX IF NOT EXISTS idx_activity_events_created_id ON activity_events(created_at, id);
+    -- Superseded by the composites above, only left behind on upgraded databases
+    DROP INDEX IF EXISTS idx_tasks_status;
+    DROP INDEX IF EXISTS idx_tasks_agent;
+    DROP INDEX IF EXISTS idx_activity_events_type;
+    DROP INDEX IF EXISTS idx_activity_events_created;
+
+    -- Payloads carry only the row id to stay well under the 8000 byte NOTIFY limit
+    CREATE OR REPLACE FUNCTION notify_tasks_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_notify('tasks_changed', OLD.id::text);
+        ELSE
+            PERFORM pg_notify('tasks_changed', NEW.id::text);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION notify_activity_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('activity_changed', NEW.id::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE TRIGGER tasks_changed
+        AFTER INSERT OR UPDATE OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION notify_tasks_changed();
+
+    CREATE OR REPLACE TRIGGER activity_changed
+        AFTER INSERT ON activity_events
+        FOR EACH ROW EXECUTE FUNCTION notify_activity_changed();
+"""
+
+# Serializes SCHEMA_SQL across workers starting at the same time
+SCHEMA_LOCK_ID = 18790
+
+# Postgres NOTIFY channels (see triggers in SCHEMA_SQL) that wake SSE streams
+TASKS_CHANNEL = "tasks_changed"
+ACTIVITY_CHANNEL = "activity_changed"
+# Streams resync at least this often (seconds) in case a notification is missed
+STREAM_RESYNC_INTERVAL = 30
+# Events per activity stream read, also the backlog sent to new clients
+ACTIVITY_PAGE_SIZE = 100
+# Activity events are stamped when queued, not when committed, so a write
+# that is slow or comes from another worker can commit behind newer events.
+# The stream re-reads this trailing window and skips ids it already sent;
+# it covers a write that times out once and is retried.
+ACTIVITY_LOOKBACK = timedelta(seconds=3 * QUERY_TIMEOUT)
+# Chunks (a task snapshot, or one page of activity events) buffered per SSE
+# client; a client that falls this far behind is disconnected so it can
+# reconnect and resync from the backlog instead of silently missing events
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Dedicated pool connection holding the LISTEN subscriptions, replaced if it drops
+listener_conn: asyncpg.Connection = None
+listener_reconnect: Optional[asyncio.Task] = None
+# Seconds between attempts to re-establish a dropped LISTEN connection
+LISTENER_RETRY_DELAY = 5
+
+# Activity events waiting to be written, flushed in batches with COPY
+# created_at is stamped per event: the NOW() default is the transaction start,
+# which would give every row of a batch the same timestamp
+ACTIVITY_COLUMNS = ("id", "event_type", "source", "data", "created_at")
+ACTIVITY_BATCH_SIZE = 500
+ACTIVITY_QUEUE_SIZE = 10000
+# Seconds to wait before retrying a batch that hit a timeout or connection error
+ACTIVITY_RETRY_DELAY = 1
+activity_write_queue: asyncio.Queue = None
+
 
 async def get_db():
     """Get database connection from pool"""
@@ -37,14 +163,23 @@ async def get_db():
         yield conn
 
 
+@lru_cache(maxsize=None)
+def task_update_sql(columns: tuple) -> str:
+    """UPDATE statement for a set of task columns, one stable SQL text per set"""
+    set_clause = ", ".join(f"{column} = ${i + 2}" for i, column in enumerate(columns))
+    return f"UPDATE tasks SET {set_clause} WHERE id = $1 RETURNING *"
+
+
 # FastAPI app
 app = FastAPI(
     title="Mission Control API",
     description="Task management and activity tracking for RunYourAgent",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # Pydantic models
@@ -94,65 +229,291 @@ class AgentProfile(BaseModel):
     updated_at: str
 
 
+# Response rows, encoded with a schema-specialized msgspec encoder.
+# UUID and datetime fields are passed through and encoded natively.
+class TaskRow(msgspec.Struct):
+    id: uuid.UUID
+    title: str
+    description: Optional[str]
+    status: str
+    priority: int
+    agent_id: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+
+
+class TaskSummaryRow(msgspec.Struct):
+    id: uuid.UUID
+    title: str
+    description: Optional[str]
+    status: str
+    priority: int
+    agent_id: Optional[str]
+    updated_at: datetime
+
+
+class ActivityRow(msgspec.Struct):
+    id: uuid.UUID
+    event_type: str
+    source: Optional[str]
+    data: Optional[str]
+    created_at: datetime
+
+
+class AgentRow(msgspec.Struct):
+    agent_id: str
+    name: str
+    description: Optional[str]
+    config: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+def row_converter(struct):
+    """Build an asyncpg Record -> Struct converter that projects the fields in one call"""
+    get_fields = itemgetter(*struct.__struct_fields__)
+    return lambda row: struct(*get_fields(row))
+
+
+record_to_task = row_converter(TaskRow)
+record_to_task_summary = row_converter(TaskSummaryRow)
+record_to_activity = row_converter(ActivityRow)
+record_to_agent = row_converter(AgentRow)
+
+encoder = msgspec.json.Encoder()
+
+
+# Encoded response bodies: cache key -> (expiry on the monotonic clock, body)
+_response_cache: dict = {}
+# Bumped by every invalidation. Handlers record it before querying and only
+# cache their body if it is unchanged, so a read that raced a write cannot
+# store pre-write rows after the write invalidated them.
+_cache_generation = 0
+
+
+def encoded_response(content: Any, cache_key: Optional[str] = None, generation: int = -1) -> Response:
+    """Encode response rows straight to JSON bytes, caching them if generation is still current"""
+    body = encoder.encode(content)
+    if cache_key and CACHE_TTL > 0 and generation == _cache_generation:
+        if len(_response_cache) >= CACHE_MAX_ENTRIES:
+            _response_cache.clear()
+        _response_cache[cache_key] = (time.monotonic() + CACHE_TTL, body)
+    return Response(content=body, media_type="application/json")
+
+
+def cached_response(cache_key: str) -> Optional[Response]:
+    """Get a cached response body if it has not expired"""
+    entry = _response_cache.get(cache_key)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return Response(content=entry[1], media_type="application/json")
+
+
+def invalidate_cache(prefix: str):
+    """Drop cached responses whose key starts with prefix"""
+    global _cache_generation
+    _cache_generation += 1
+    for key in [key for key in _response_cache if key.startswith(prefix)]:
+        del _response_cache[key]
+
+
+# Change listener
+def listener_channels():
+    """LISTEN channels and the broadcaster callbacks they wake"""
+    return (
+        (TASKS_CHANNEL, app.state.task_broadcaster.notify),
+        (ACTIVITY_CHANNEL, app.state.activity_broadcaster.notify),
+    )
+
+
+async def connect_listener():
+    """Acquire the LISTEN connection and subscribe the broadcasters"""
+    global listener_conn
+    conn = await pool.acquire()
+    try:
+        for channel, callback in listener_channels():
+            await conn.add_listener(channel, callback)
+    except Exception:
+        await pool.release(conn)
+        raise
+    conn.add_termination_listener(on_listener_terminated)
+    listener_conn = conn
+
+
+async def disconnect_listener():
+    """Unsubscribe and return the LISTEN connection to the pool"""
+    global listener_conn
+    conn, listener_conn = listener_conn, None
+    if conn is None:
+        return
+    conn.remove_termination_listener(on_listener_terminated)
+    if not conn.is_closed():
+        for channel, callback in listener_channels():
+            await conn.remove_listener(channel, callback)
+    await pool.release(conn)
+
+
+def on_listener_terminated(conn):
+    """Termination callback, re-establishes LISTEN after e.g. a Postgres restart"""
+    global listener_reconnect
+    print("Mission Control API: Change listener connection lost, reconnecting")
+    listener_reconnect = asyncio.create_task(reconnect_listener())
+
+
+async def reconnect_listener():
+    """Replace a dropped LISTEN connection, retrying until the database is back"""
+    await disconnect_listener()
+    while True:
+        try:
+            await connect_listener()
+        except Exception as e:
+            print(f"Mission Control API: Change listener reconnect failed: {e}")
+            await asyncio.sleep(LISTENER_RETRY_DELAY)
+            continue
+
+        # Catch up on changes missed while no one was listening
+        app.state.task_broadcaster.changed.set()
+        app.state.activity_broadcaster.changed.set()
+        print("Mission Control API: Change listener reconnected")
+        return
+
+
 # Startup/Shutdown events
 @app.on_event("startup")
 async def startup():
-    """Initialize database connection pool"""
-    global pool
+    """Initialize database connection pool, change listeners and activity writer"""
+    global pool, activity_write_queue
     if not DB_URL:
         raise RuntimeError("MISSION_CONTROL_DB_URL environment variable not set")
 
+    max_size = max(DB_POOL_MAX // WORKERS, 2)
     pool = await asyncpg.create_pool(
         DB_URL,
-        min_size=2,
-        max_size=10,
-        command_timeout=60
+        min_size=min(max(DB_POOL_MIN // WORKERS, 1), max_size),
+        max_size=max_size,
+        max_inactive_connection_lifetime=300,
+        command_timeout=30,
+        statement_cache_size=1024
     )
     print(f"Mission Control API: Connected to database")
 
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", SCHEMA_LOCK_ID)
+            await conn.execute(SCHEMA_SQL)
+
+    app.state.task_broadcaster = TaskBroadcaster()
+    app.state.activity_broadcaster = ActivityBroadcaster()
+
+    await connect_listener()
+
+    app.state.task_broadcaster.start()
+    app.state.activity_broadcaster.start()
+
+    activity_write_queue = asyncio.Queue(maxsize=ACTIVITY_QUEUE_SIZE)
+    app.state.activity_writer = asyncio.create_task(write_activity_batches())
+
 
 @app.on_event("shutdown")
 async def shutdown():
     """Close database connection pool"""
     global pool
+    writer = getattr(app.state, "activity_writer", None)
+    if writer:
+        # Let queued activity events reach the database before closing
+        try:
+            await asyncio.wait_for(activity_write_queue.join(), QUERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Mission Control API: Dropped {activity_write_queue.qsize()} queued activity events")
+        writer.cancel()
+    for name in ("task_broadcaster", "activity_broadcaster"):
+        broadcaster = getattr(app.state, name, None)
+        if broadcaster:
+            await broadcaster.stop()
+    if listener_reconnect:
+        listener_reconnect.cancel()
     if pool:
+        await disconnect_listener()
         await pool.close()
         print("Mission Control API: Database connection closed")
 
 
 # Auth middleware
-async def verify_token(authorization: Optional[str] = Header(None)):
-    """Verify request token"""
-    if not TOKEN:
-        return  # No token configured, skip auth
+# Paths served without a token
+PUBLIC_PATHS = {"/health", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"}
+
+
+class TokenAuthMiddleware:
+    """Verify the bearer token as plain ASGI, before routing"""
 
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing authorization header")
+    def __init__(self, app):
+        self.app = app
+        self.token = TOKEN.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TOKEN or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value
+                break
+
+        if authorization is None:
+            status_code, detail = 401, "Missing authorization header"
+        else:
+            scheme, _, token = authorization.partition(b" ")
+            if scheme.lower() != b"bearer":
+                status_code, detail = 401, "Invalid authorization scheme"
+            elif not hmac.compare_digest(token, self.token):
+                status_code, detail = 403, "Invalid token"
+            else:
+                await self.app(scope, receive, send)
+                return
 
-    scheme, _, token = authorization.partition(" ")
-    if scheme.lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Invalid authorization scheme")
+        response = ORJSONResponse({"detail": detail}, status_code=status_code)
+        await response(scope, receive, send)
 
-    if token != TOKEN:
-        raise HTTPException(status_code=403, detail="Invalid token")
+
+app.add_middleware(TokenAuthMiddleware)
 
 
 # Health check
+# Seconds a database liveness result is reused before probing again
+HEALTH_CHECK_TTL = 5
+
+# Last database probe: (monotonic timestamp, database reachable)
+_db_health = (0.0, False)
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    db_ok = pool is not None
-    try:
-        if pool:
-            async with pool.acquire() as conn:
-                await conn.fetchval("SELECT 1")
-    except Exception as e:
-        db_ok = False
-
-    return JSONResponse({
+    global _db_health
+    checked_at, db_ok = _db_health
+    now = time.monotonic()
+    if now - checked_at >= HEALTH_CHECK_TTL:
+        db_ok = pool is not None
+        try:
+            if pool:
+                async with pool.acquire() as conn:
+                    await conn.fetchval("SELECT 1", timeout=QUERY_TIMEOUT)
+        except Exception as e:
+            db_ok = False
+        _db_health = (now, db_ok)
+
+    return ORJSONResponse({
         "status": "healthy" if db_ok else "unhealthy",
         "database": "connected" if db_ok else "disconnected",
-        "instance_id": OPENCLAW_INSTANCE_ID
+        "instance_id": OPENCLAW_INSTANCE_ID,
+        "pool": {
+            "size": pool.get_size(),
+            "idle": pool.get_idle_size(),
+            "max": pool.get_max_size(),
+        } if pool else None
     })
 
 
@@ -160,106 +521,62 @@ async def health():
 @app.get("/kanban")
 async def get_kanban_tasks(
     status: Optional[str] = None,
-    agent_id: Optional[str] = None,
-    _: None = Depends(verify_token)
+    agent_id: Optional[str] = None
 ):
     """Get all tasks, optionally filtered by status or agent"""
+    cache_key = f"kanban:{status}:{agent_id}"
+    cached = cached_response(cache_key)
+    if cached:
+        return cached
+    generation = _cache_generation
+
     async with pool.acquire() as conn:
         if status:
-            rows = await conn.fetch(
-                "SELECT * FROM tasks WHERE status = $1 ORDER BY priority DESC, created_at DESC",
-                status
-            )
+            rows = await conn.fetch(TASKS_BY_STATUS_SQL, status, timeout=QUERY_TIMEOUT)
         elif agent_id:
-            rows = await conn.fetch(
-                "SELECT * FROM tasks WHERE agent_id = $1 ORDER BY priority DESC, created_at DESC",
-                agent_id
-            )
+            rows = await conn.fetch(TASKS_BY_AGENT_SQL, agent_id, timeout=QUERY_TIMEOUT)
         else:
-            rows = await conn.fetch(
-                "SELECT * FROM tasks ORDER BY priority DESC, created_at DESC"
-            )
-
-        return [
-            {
-                "id": str(row["id"]),
-                "title": row["title"],
-                "description": row["description"],
-                "status": row["status"],
-                "priority": row["priority"],
-                "agent_id": row["agent_id"],
-                "created_at": row["created_at"].isoformat(),
-                "updated_at": row["updated_at"].isoformat(),
-                "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
-            }
-            for row in rows
-        ]
+            rows = await conn.fetch(TASKS_ALL_SQL, timeout=QUERY_TIMEOUT)
+
+    return encoded_response([record_to_task(row) for row in rows], cache_key, generation)
 
 
 @app.post("/kanban/tasks")
 async def create_task(
-    task: TaskCreate,
-    _: None = Depends(verify_token)
+    task: TaskCreate
 ):
     """Create a new task"""
+    task_id = uuid.uuid4()
     async with pool.acquire() as conn:
-        task_id = uuid.uuid4()
-        await conn.execute(
-            """
-            INSERT INTO tasks (id, title, description, status, priority, agent_id)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            """,
-            task_id, task.title, task.description, task.status, task.priority, task.agent_id
+        row = await conn.fetchrow(
+            TASK_INSERT_SQL,
+            task_id, task.title, task.description, task.status, task.priority, task.agent_id,
+            timeout=QUERY_TIMEOUT
         )
 
-        row = await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", task_id)
+    invalidate_cache("kanban:")
 
-        return {
-            "id": str(row["id"]),
-            "title": row["title"],
-            "description": row["description"],
-            "status": row["status"],
-            "priority": row["priority"],
-            "agent_id": row["agent_id"],
-            "created_at": row["created_at"].isoformat(),
-            "updated_at": row["updated_at"].isoformat(),
-            "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
-        }
+    return encoded_response(record_to_task(row))
 
 
 @app.get("/kanban/tasks/{task_id}")
 async def get_task(
-    task_id: str,
-    _: None = Depends(verify_token)
+    task_id: uuid.UUID
 ):
     """Get a specific task"""
     async with pool.acquire() as conn:
-        try:
-            row = await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", uuid.UUID(task_id))
-        except (asyncpg.DataError, ValueError):
-            raise HTTPException(status_code=400, detail="Invalid task ID")
-
-        if not row:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        return {
-            "id": str(row["id"]),
-            "title": row["title"],
-            "description": row["description"],
-            "status": row["status"],
-            "priority": row["priority"],
-            "agent_id": row["agent_id"],
-            "created_at": row["created_at"].isoformat(),
-            "updated_at": row["updated_at"].isoformat(),
-            "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
-        }
+        row = await conn.fetchrow(TASK_BY_ID_SQL, task_id, timeout=QUERY_TIMEOUT)
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    return encoded_response(record_to_task(row))
 
 
 @app.put("/kanban/tasks/{task_id}")
 async def update_task(
-    task_id: str,
-    task: TaskUpdate,
-    _: None = Depends(verify_token)
+    task_id: uuid.UUID,
+    task: TaskUpdate
 ):
     """Update a task"""
     updates = {}
@@ -281,256 +598,341 @@ async def update_task(
 
     updates["updated_at"] = datetime.now()
 
-    # Build dynamic SQL
-    set_clause = ", ".join(f"{k} = ${i+2}" for i, k in enumerate(updates.keys()))
-    values = list(updates.values())
+    columns = tuple(column for column in TASK_UPDATE_COLUMNS if column in updates)
+    values = [updates[column] for column in columns]
 
     async with pool.acquire() as conn:
         try:
-            await conn.execute(
-                f"UPDATE tasks SET {set_clause} WHERE id = $1",
-                uuid.UUID(task_id), *values
-            )
-        except (asyncpg.DataError, ValueError):
-            raise HTTPException(status_code=400, detail="Invalid task ID")
-
-        row = await conn.fetchrow("SELECT * FROM tasks WHERE id = $1", uuid.UUID(task_id))
-
-        if not row:
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        return {
-            "id": str(row["id"]),
-            "title": row["title"],
-            "description": row["description"],
-            "status": row["status"],
-            "priority": row["priority"],
-            "agent_id": row["agent_id"],
-            "created_at": row["created_at"].isoformat(),
-            "updated_at": row["updated_at"].isoformat(),
-            "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None,
-        }
+            row = await conn.fetchrow(task_update_sql(columns), task_id, *values, timeout=QUERY_TIMEOUT)
+        except asyncpg.DataError:
+            raise HTTPException(status_code=400, detail="Invalid task data")
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    invalidate_cache("kanban:")
+
+    return encoded_response(record_to_task(row))
 
 
 @app.delete("/kanban/tasks/{task_id}")
 async def delete_task(
-    task_id: str,
-    _: None = Depends(verify_token)
+    task_id: uuid.UUID
 ):
     """Delete a task"""
     async with pool.acquire() as conn:
-        try:
-            result = await conn.execute(
-                "DELETE FROM tasks WHERE id = $1",
-                uuid.UUID(task_id)
-            )
-        except (asyncpg.DataError, ValueError):
-            raise HTTPException(status_code=400, detail="Invalid task ID")
+        deleted = await conn.fetchval(TASK_DELETE_SQL, task_id, timeout=QUERY_TIMEOUT)
+
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Task not found")
 
-        if result == "DELETE 0":
-            raise HTTPException(status_code=404, detail="Task not found")
+    invalidate_cache("kanban:")
 
-        return {"success": True, "id": task_id}
+    return {"success": True, "id": task_id}
 
 
 # Activity endpoints
 @app.get("/activity")
 async def get_activity(
     limit: int = Query(100, ge=1, le=1000),
-    event_type: Optional[str] = None,
-    _: None = Depends(verify_token)
+    event_type: Optional[str] = None
 ):
     """Get activity events"""
     async with pool.acquire() as conn:
         if event_type:
-            rows = await conn.fetch(
-                "SELECT * FROM activity_events WHERE event_type = $1 ORDER BY created_at DESC LIMIT $2",
-                event_type, limit
-            )
+            rows = await conn.fetch(ACTIVITY_BY_TYPE_SQL, event_type, limit, timeout=QUERY_TIMEOUT)
         else:
-            rows = await conn.fetch(
-                "SELECT * FROM activity_events ORDER BY created_at DESC LIMIT $1",
-                limit
-            )
-
-        return [
-            {
-                "id": str(row["id"]),
-                "event_type": row["event_type"],
-                "source": row["source"],
-                "data": row["data"],
-                "created_at": row["created_at"].isoformat(),
-            }
-            for row in rows
-        ]
+            rows = await conn.fetch(ACTIVITY_RECENT_SQL, limit, timeout=QUERY_TIMEOUT)
+
+    return encoded_response([record_to_activity(row) for row in rows])
 
 
 @app.post("/activity")
 async def log_activity(
-    event_type: str,
+    event_type: str = Query(..., min_length=1, max_length=100),
     data: Optional[dict] = None,
-    source: Optional[str] = None,
-    _: None = Depends(verify_token)
+    source: Optional[str] = Query(None, max_length=100)
 ):
-    """Log an activity event"""
+    """Queue an activity event for the batched writer"""
+    event_id = uuid.uuid4()
+    await activity_write_queue.put(
+        (event_id, event_type, source, orjson.dumps(data).decode() if data else None, datetime.now(timezone.utc))
+    )
+
+    return {
+        "success": True,
+        "id": event_id
+    }
+
+
+async def copy_activity_records(records: list):
+    """Write activity event records with a single COPY"""
     async with pool.acquire() as conn:
-        event_id = uuid.uuid4()
-        await conn.execute(
-            """
-            INSERT INTO activity_events (id, event_type, source, data)
-            VALUES ($1, $2, $3, $4)
-            """,
-            event_id, event_type, source, json.dumps(data) if data else None
+        await conn.copy_records_to_table(
+            "activity_events",
+            records=records,
+            columns=ACTIVITY_COLUMNS,
+            timeout=QUERY_TIMEOUT
         )
 
-        return {
-            "success": True,
-            "id": str(event_id)
-        }
+
+async def write_activity_batches():
+    """Write queued activity events, one COPY per batch"""
+    while True:
+        # Events queued while the previous COPY was in flight go out together,
+        # so a lone event is written at once and bursts are batched
+        records = [await activity_write_queue.get()]
+        while len(records) < ACTIVITY_BATCH_SIZE and not activity_write_queue.empty():
+            records.append(activity_write_queue.get_nowait())
+
+        try:
+            await copy_activity_records(records)
+        except asyncpg.PostgresError as e:
+            if len(records) == 1:
+                print(f"Mission Control API: Dropped activity event {records[0][0]}: {e}")
+            else:
+                # The server rejected the batch, most likely over one bad row:
+                # write rows one by one so the rest still land
+                print(f"Mission Control API: Activity batch of {len(records)} failed, retrying per row: {e}")
+                for record in records:
+                    try:
+                        await copy_activity_records([record])
+                    except Exception as e:
+                        print(f"Mission Control API: Dropped activity event {record[0]}: {e}")
+        except Exception as e:
+            # Timeout or lost connection: retry once. If the first COPY did
+            # commit, the retry fails on the primary key instead of duplicating.
+            print(f"Mission Control API: Failed to write {len(records)} activity events, retrying: {e}")
+            await asyncio.sleep(ACTIVITY_RETRY_DELAY)
+            try:
+                await copy_activity_records(records)
+            except Exception as e:
+                print(f"Mission Control API: Dropped {len(records)} activity events: {e}")
+        finally:
+            for _ in records:
+                activity_write_queue.task_done()
 
 
 # SSE streaming endpoints
-async def task_event_generator():
-    """Stream task updates via SSE"""
-    try:
+# An explicit identity encoding keeps GZipMiddleware from buffering the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+    "Content-Encoding": "identity",
+}
+
+
+def sse_frame(event: bytes, content: Any) -> bytes:
+    """Encode one SSE event as bytes, joined in a single allocation"""
+    return b"".join((b"event: ", event, b"\ndata: ", encoder.encode(content), b"\n\n"))
+
+
+class Broadcaster(ABC):
+    """Re-reads a table once per change notification and fans the SSE frames out to every client"""
+
+    def __init__(self):
+        self.subscribers: set = set()
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def notify(self, conn, pid, channel, payload):
+        """LISTEN callback, a burst of notifications collapses into one read"""
+        self.changed.set()
+
+    def backlog(self) -> List[bytes]:
+        """Frames a new client receives before live updates"""
+        return []
+
+    def subscribe(self):
+        """Register a client queue, returned with the current backlog"""
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue, self.backlog()
+
+    def publish(self, chunk: bytes):
+        for queue in list(self.subscribers):
+            if queue.full():
+                self.disconnect(queue)
+            else:
+                queue.put_nowait(chunk)
+
+    def disconnect(self, queue: asyncio.Queue):
+        """Drop a client that stopped keeping up, ending its stream"""
+        self.subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    @abstractmethod
+    async def poll(self):
+        """Read changes since the last poll and publish them"""
+
+    async def run(self):
         while True:
+            self.changed.clear()
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Mission Control API: {type(self).__name__} read failed: {e}")
+
+            try:
+                await asyncio.wait_for(self.changed.wait(), STREAM_RESYNC_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+class TaskBroadcaster(Broadcaster):
+    """Publishes the most recently updated tasks as one update frame"""
+
+    def __init__(self):
+        super().__init__()
+        self.latest: Optional[bytes] = None
+
+    def backlog(self) -> List[bytes]:
+        return [self.latest] if self.latest else []
+
+    async def poll(self):
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(TASKS_RECENT_SQL, timeout=QUERY_TIMEOUT)
+
+        tasks = [record_to_task_summary(row) for row in rows]
+        self.latest = sse_frame(b"update", tasks)
+        self.publish(self.latest)
+
+
+class ActivityBroadcaster(Broadcaster):
+    """Publishes new activity events, one frame per event and one chunk per page"""
+
+    def __init__(self):
+        super().__init__()
+        # Newest created_at published so far, None until the first event
+        self.high_water = None
+        # Ids published within the lookback window: id -> created_at
+        self.sent: dict = {}
+        self.recent = deque(maxlen=ACTIVITY_PAGE_SIZE)
+
+    def backlog(self) -> List[bytes]:
+        return list(self.recent)
+
+    def publish_rows(self, rows: list):
+        if not rows:
+            return
+        frames = [sse_frame(b"activity", record_to_activity(row)) for row in rows]
+        self.recent.extend(frames)
+        self.publish(b"".join(frames))
+        for row in rows:
+            self.sent[row["id"]] = row["created_at"]
+            if self.high_water is None or row["created_at"] > self.high_water:
+                self.high_water = row["created_at"]
+
+    async def poll(self):
+        if self.high_water is None:
             async with pool.acquire() as conn:
-                # Get recent tasks
-                rows = await conn.fetch(
-                    "SELECT * FROM tasks ORDER BY updated_at DESC LIMIT 100"
-                )
-
-                tasks = [
-                    {
-                        "id": str(row["id"]),
-                        "title": row["title"],
-                        "description": row["description"],
-                        "status": row["status"],
-                        "priority": row["priority"],
-                        "agent_id": row["agent_id"],
-                        "updated_at": row["updated_at"].isoformat(),
-                    }
-                    for row in rows
-                ]
-
-                yield f"event: update\ndata: {json.dumps(tasks)}\n\n"
-
-            await asyncio.sleep(2)
-    except asyncio.CancelledError:
-        pass
+                rows = await conn.fetch(ACTIVITY_RECENT_SQL, ACTIVITY_PAGE_SIZE, timeout=QUERY_TIMEOUT)
+            rows.reverse()
+            self.publish_rows(rows)
+            return
 
+        horizon = self.high_water - ACTIVITY_LOOKBACK
+        cursor = (horizon, uuid.UUID(int=0))
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(ACTIVITY_SINCE_SQL, *cursor, ACTIVITY_PAGE_SIZE, timeout=QUERY_TIMEOUT)
 
-async def activity_event_generator():
-    """Stream activity events via SSE"""
-    try:
-        last_event_id = None
+            self.publish_rows([row for row in rows if row["id"] not in self.sent])
+
+            # A full page means there may be more waiting, read on right away
+            if len(rows) < ACTIVITY_PAGE_SIZE:
+                break
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
 
+        # Forget ids that have fallen out of the window
+        horizon = self.high_water - ACTIVITY_LOOKBACK
+        self.sent = {event_id: created_at for event_id, created_at in self.sent.items() if created_at >= horizon}
+
+
+async def broadcast_stream(broadcaster: Broadcaster):
+    """Stream a broadcaster's frames to one SSE client"""
+    queue, backlog = broadcaster.subscribe()
+    try:
+        for frame in backlog:
+            yield frame
         while True:
-            async with pool.acquire() as conn:
-                query = "SELECT * FROM activity_events ORDER BY created_at DESC LIMIT 100"
-                if last_event_id:
-                    query = f"SELECT * FROM activity_events WHERE created_at > '{last_event_id}' ORDER BY created_at DESC"
-
-                rows = await conn.fetch(query)
-
-                events = []
-                for row in rows:
-                    event_id = str(row["id"])
-                    events.append({
-                        "id": event_id,
-                        "event_type": row["event_type"],
-                        "source": row["source"],
-                        "data": row["data"],
-                        "created_at": row["created_at"].isoformat(),
-                    })
-                    if not last_event_id:
-                        last_event_id = row["created_at"].isoformat()
-
-                for event in reversed(events):
-                    yield f"event: activity\ndata: {json.dumps(event)}\n\n"
-
-            await asyncio.sleep(1)
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            yield chunk
     except asyncio.CancelledError:
         pass
+    finally:
+        broadcaster.subscribers.discard(queue)
 
 
 @app.get("/kanban/stream")
-async def stream_kanban(
-    _: None = Depends(verify_token)
-):
+async def stream_kanban():
     """SSE stream for task updates"""
     return StreamingResponse(
-        task_event_generator(),
+        broadcast_stream(app.state.task_broadcaster),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+        headers=SSE_HEADERS
     )
 
 
 @app.get("/activity/stream")
-async def stream_activity(
-    _: None = Depends(verify_token)
-):
+async def stream_activity():
     """SSE stream for activity events"""
     return StreamingResponse(
-        activity_event_generator(),
+        broadcast_stream(app.state.activity_broadcaster),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+        headers=SSE_HEADERS
     )
 
 
 # Agent profiles
 @app.get("/agent-profiles")
-async def get_agent_profiles(
-    _: None = Depends(verify_token)
-):
+async def get_agent_profiles():
     """Get all agent profiles"""
+    cached = cached_response("agents")
+    if cached:
+        return cached
+    generation = _cache_generation
+
     async with pool.acquire() as conn:
-        rows = await conn.fetch("SELECT * FROM agent_profiles ORDER BY name")
+        rows = await conn.fetch(AGENT_PROFILES_SQL, timeout=QUERY_TIMEOUT)
 
-        return [
-            {
-                "agent_id": row["agent_id"],
-                "name": row["name"],
-                "description": row["description"],
-                "config": row["config"],
-                "created_at": row["created_at"].isoformat(),
-                "updated_at": row["updated_at"].isoformat(),
-            }
-            for row in rows
-        ]
+    return encoded_response([record_to_agent(row) for row in rows], "agents", generation)
 
 
 @app.get("/agent-profiles/{agent_id}")
 async def get_agent_profile(
-    agent_id: str,
-    _: None = Depends(verify_token)
+    agent_id: str
 ):
     """Get a specific agent profile"""
+    cache_key = f"agent:{agent_id}"
+    cached = cached_response(cache_key)
+    if cached:
+        return cached
+    generation = _cache_generation
+
     async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM agent_profiles WHERE agent_id = $1",
-            agent_id
-        )
+        row = await conn.fetchrow(AGENT_PROFILE_BY_ID_SQL, agent_id, timeout=QUERY_TIMEOUT)
 
-        if not row:
-            raise HTTPException(status_code=404, detail="Agent profile not found")
+    if not row:
+        raise HTTPException(status_code=404, detail="Agent profile not found")
 
-        return {
-            "agent_id": row["agent_id"],
-            "name": row["name"],
-            "description": row["description"],
-            "config": row["config"],
-            "created_at": row["created_at"].isoformat(),
-            "updated_at": row["updated_at"].isoformat(),
-        }
+    return encoded_response(record_to_agent(row), cache_key, generation)
 
 
 if __name__ == "__main__":
@@ -539,5 +941,14 @@ if __name__ == "__main__":
     print(f"Starting Mission Control API on {HOST}:{PORT}")
     print(f"Instance ID: {OPENCLAW_INSTANCE_ID}")
     print(f"Token configured: {bool(TOKEN)}")
-
-    uvicorn.run(app, host=HOST, port=PORT)
+    print(f"Workers: {WORKERS}")
+
+    # uvicorn needs an import string (not the app object) to spawn workers
+    uvicorn.run(
+        "api_server:app" if WORKERS > 1 else app,
+        host=HOST,
+        port=PORT,
+        loop="uvloop",
+        http="httptools",
+        workers=WORKERS
+    )